@@ -1,22 +1,29 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Blueprint, Flask, current_app, request, jsonify, send_file
 from database import GoodsEntryDB
-import json
 import io
-from datetime import datetime
-import base64
 
-app = Flask(__name__)
-db = GoodsEntryDB()
+api = Blueprint('api', __name__)
+
+def create_app(db_path="goods_entry.db"):
+    """ساخت برنامه Flask؛ پایگاه داده در اولین درخواست آماده می‌شود"""
+    app = Flask(__name__)
+    app.extensions['goods_entry_db'] = GoodsEntryDB(db_path)
+    app.register_blueprint(api)
+    return app
+
+def get_db():
+    """دریافت پایگاه داده برنامه فعلی"""
+    return current_app.extensions['goods_entry_db']
 
 # فعال کردن CORS برای توسعه
-@app.after_request
+@api.after_app_request
 def after_request(response):
     response.headers.add('Access-Control-Allow-Origin', '*')
     response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization')
     response.headers.add('Access-Control-Allow-Methods', 'GET,PUT,POST,DELETE,OPTIONS')
     return response
 
-@app.route('/api/entries', methods=['POST', 'OPTIONS'])
+@api.route('/api/entries', methods=['POST', 'OPTIONS'])
 def create_entry():
     """ایجاد یک فرم جدید"""
     if request.method == 'OPTIONS':
@@ -61,7 +68,7 @@ def create_entry():
                 'mime_type': doc.get('mimeType', 'image/jpeg')
             })
         
-        entry_id, final_entry_number = db.create_entry(form_data, items_data, processed_documents)
+        entry_id, final_entry_number = get_db().create_entry(form_data, items_data, processed_documents)
         
         return jsonify({
             'success': True,
@@ -74,11 +81,11 @@ def create_entry():
         print(f"❌ خطا در ایجاد فرم: {e}")
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/entries/<entry_number>', methods=['GET'])
+@api.route('/api/entries/<entry_number>', methods=['GET'])
 def get_entry(entry_number):
     """دریافت اطلاعات یک فرم"""
     try:
-        entry = db.get_entry_by_number(entry_number)
+        entry = get_db().get_entry_by_number(entry_number)
         if not entry:
             return jsonify({'error': 'فرم یافت نشد'}), 404
         
@@ -88,25 +95,25 @@ def get_entry(entry_number):
         print(f"❌ خطا در دریافت فرم: {e}")
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/entries', methods=['GET'])
+@api.route('/api/entries', methods=['GET'])
 def get_all_entries():
     """دریافت لیست تمام فرم‌ها"""
     try:
         limit = request.args.get('limit', 100, type=int)
         offset = request.args.get('offset', 0, type=int)
         
-        entries = db.get_all_entries(limit, offset)
+        entries = get_db().get_all_entries(limit, offset)
         return jsonify(entries)
         
     except Exception as e:
         print(f"❌ خطا در دریافت لیست فرم‌ها: {e}")
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/documents/<entry_number>/<document_name>', methods=['GET'])
+@api.route('/api/documents/<entry_number>/<document_name>', methods=['GET'])
 def get_document(entry_number, document_name):
     """دریافت فایل سند"""
     try:
-        file_data, mime_type = db.get_document_file(entry_number, document_name)
+        file_data, mime_type = get_db().get_document_file(entry_number, document_name)
         if not file_data:
             return jsonify({'error': 'سند یافت نشد'}), 404
         
@@ -121,21 +128,21 @@ def get_document(entry_number, document_name):
         print(f"❌ خطا در دریافت سند: {e}")
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/statistics', methods=['GET'])
+@api.route('/api/statistics', methods=['GET'])
 def get_statistics():
     """دریافت آمار پایگاه داده"""
     try:
-        stats = db.get_statistics()
+        stats = get_db().get_statistics()
         return jsonify(stats)
     except Exception as e:
         print(f"❌ خطا در دریافت آمار: {e}")
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/entries/<entry_number>', methods=['DELETE'])
+@api.route('/api/entries/<entry_number>', methods=['DELETE'])
 def delete_entry(entry_number):
     """حذف یک فرم"""
     try:
-        success = db.delete_entry(entry_number)
+        success = get_db().delete_entry(entry_number)
         if not success:
             return jsonify({'error': 'فرم یافت نشد'}), 404
         
@@ -145,20 +152,22 @@ def delete_entry(entry_number):
         print(f"❌ خطا در حذف فرم: {e}")
         return jsonify({'error': str(e)}), 500
 
-@app.route('/api/health', methods=['GET'])
+@api.route('/api/health', methods=['GET'])
 def health_check():
     """بررسی سلامت سرور"""
     return jsonify({'status': 'ok', 'message': 'سرور فعال است'})
 
-@app.route('/api/generate-entry-number', methods=['GET'])
+@api.route('/api/generate-entry-number', methods=['GET'])
 def generate_entry_number():
     """تولید شماره ورود منحصر به فرد"""
     try:
-        unique_number = db.generate_unique_entry_number()
+        unique_number = get_db().generate_unique_entry_number()
         return jsonify({'entry_number': unique_number})
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+app = create_app()
+
 if __name__ == '__main__':
     print("🚀 سرور API در حال راه‌اندازی...")
     print("📝 آدرس‌های در دسترس:")
@@ -0,0 +1,72 @@
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from statistics import median
+
+from migrations import migrate
+
+# بودجه زمان راه‌اندازی سرد (ثانیه)
+STARTUP_BUDGET_SECONDS = 1.0
+RUNS = 5
+
+# هر اجرا در یک پردازش تازه انجام می‌شود تا کش ماژول‌ها اثری نداشته باشد؛
+# مسیر /api/statistics اولین اتصال و بررسی اسکیما را هم شامل می‌شود
+STARTUP_SCRIPT = """
+import sys, time
+import api_server
+app = api_server.create_app(sys.argv[1])
+start = time.perf_counter()
+response = app.test_client().get('/api/statistics')
+assert response.status_code == 200, response.status_code
+print(time.perf_counter() - start)
+"""
+
+
+def measure_startup(db_path, script=STARTUP_SCRIPT, runs=RUNS):
+    """اندازه‌گیری زمان راه‌اندازی سرد و زمان اولین درخواست در چند اجرا"""
+    timings = []
+    first_request_timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = subprocess.run([sys.executable, "-c", script, db_path], check=True,
+                                capture_output=True, text=True, cwd=Path(__file__).parent)
+        timings.append(time.perf_counter() - start)
+        first_request_timings.append(float(result.stdout.strip().splitlines()[-1]))
+    return timings, first_request_timings
+
+
+def main():
+    print("⏱️ اندازه‌گیری زمان راه‌اندازی سرور...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        # کپی موقت تا پایگاه داده اصلی تغییر نکند؛ مهاجرت یک‌باره خارج از زمان‌سنجی انجام می‌شود
+        db_path = str(Path(tmp_dir) / "goods_entry.db")
+        shutil.copy(Path(__file__).parent / "goods_entry.db", db_path)
+        migrate(db_path)
+
+        try:
+            timings, first_request_timings = measure_startup(db_path)
+        except subprocess.CalledProcessError as e:
+            print("❌ اجرای برنامه با خطا مواجه شد:")
+            print(e.stderr)
+            return 1
+
+    result = median(timings)
+
+    print(f"   میانه: {result:.3f} ثانیه (بودجه: {STARTUP_BUDGET_SECONDS} ثانیه)")
+    print(f"   کمترین: {min(timings):.3f} / بیشترین: {max(timings):.3f}")
+    print(f"   میانه اولین درخواست پایگاه داده: {median(first_request_timings):.3f} ثانیه")
+
+    if result > STARTUP_BUDGET_SECONDS:
+        print("❌ زمان راه‌اندازی از بودجه بیشتر است")
+        return 1
+
+    print("✅ زمان راه‌اندازی در محدوده بودجه است")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -4,68 +4,40 @@ from datetime import datetime
 import os
 from pathlib import Path
 import random
+import threading
+from migrations import connect, migrate
 
 class GoodsEntryDB:
     def __init__(self, db_path="goods_entry.db"):
         self.db_path = db_path
-        self.init_database()
+        # اسکیما در اولین استفاده بررسی می‌شود، نه هنگام ساخت شیء
+        self._initialized = False
+        self._init_lock = threading.Lock()
     
     def init_database(self):
-        """ایجاد جداول پایگاه داده"""
-        conn = sqlite3.connect(self.db_path)
-        cursor = conn.cursor()
-        
-        # جدول اصلی فرم
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS entry_forms (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                entry_number TEXT UNIQUE NOT NULL,
-                entry_date TEXT NOT NULL,
-                entry_time TEXT NOT NULL,
-                full_name TEXT NOT NULL,
-                vehicle_number TEXT,
-                roadway_bill TEXT,
-                internal_bill TEXT,
-                controller TEXT,
-                description TEXT,
-                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-            )
-        ''')
-        
-        # جدول آیتم‌های کالا
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS entry_items (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                entry_id INTEGER NOT NULL,
-                row_number INTEGER NOT NULL,
-                item_name TEXT NOT NULL,
-                serial_number TEXT,
-                invoice_number TEXT,
-                quantity REAL NOT NULL,
-                unit TEXT NOT NULL,
-                FOREIGN KEY (entry_id) REFERENCES entry_forms (id) ON DELETE CASCADE
-            )
-        ''')
-        
-        # جدول اسناد اسکن شده
-        cursor.execute('''
-            CREATE TABLE IF NOT EXISTS scanned_documents (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                entry_id INTEGER NOT NULL,
-                document_name TEXT NOT NULL,
-                document_type TEXT NOT NULL,
-                file_path TEXT NOT NULL,
-                file_size INTEGER,
-                mime_type TEXT,
-                scan_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-                FOREIGN KEY (entry_id) REFERENCES entry_forms (id) ON DELETE CASCADE
-            )
-        ''')
-        
-        conn.commit()
-        conn.close()
-        print("✅ پایگاه داده با موفقیت ایجاد شد")
+        """ایجاد و به‌روزرسانی جداول پایگاه داده"""
+        with self._init_lock:
+            if self._initialized:
+                return
+            version = migrate(self.db_path)
+            self._initialized = True
+            print(f"✅ پایگاه داده آماده است (نسخه {version})")
+    
+    def _connect(self):
+        """اتصال به پایگاه داده با فعال بودن کلیدهای خارجی"""
+        if not self._initialized:
+            self.init_database()
+        return connect(self.db_path)
+    
+    def _close(self, conn):
+        """بستن اتصال پس از به‌روزرسانی آمار جداولی که این اتصال استفاده کرده"""
+        try:
+            conn.execute('PRAGMA optimize')
+        except sqlite3.Error:
+            # به‌روزرسانی آمار اختیاری است و نباید عملیات اصلی را خراب کند
+            pass
+        finally:
+            conn.close()
     
     def generate_unique_entry_number(self):
         """تولید شماره ورود منحصر به فرد"""
@@ -75,11 +47,11 @@ class GoodsEntryDB:
         unique_number = f"{current_persian_year}{timestamp}{random_num}"
         
         # بررسی منحصر به فرد بودن
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         cursor.execute('SELECT id FROM entry_forms WHERE entry_number = ?', (unique_number,))
         existing = cursor.fetchone()
-        conn.close()
+        self._close(conn)
         
         if existing:
             # اگر بازهم تکراری بود، یک شماره دیگر تولید کن
@@ -132,7 +104,7 @@ class GoodsEntryDB:
     
     def create_entry(self, form_data, items_data, documents_data=None):
         """ایجاد یک رکورد جدید در پایگاه داده"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         try:
@@ -223,11 +195,11 @@ class GoodsEntryDB:
             print(f"❌ خطا در ایجاد فرم: {e}")
             raise e
         finally:
-            conn.close()
+            self._close(conn)
     
     def get_entry_by_number(self, entry_number):
         """دریافت اطلاعات یک فرم بر اساس شماره ورود"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         try:
@@ -296,11 +268,11 @@ class GoodsEntryDB:
             print(f"❌ خطا در دریافت فرم: {e}")
             return None
         finally:
-            conn.close()
+            self._close(conn)
     
     def get_all_entries(self, limit=100, offset=0):
         """دریافت تمام فرم‌ها با قابلیت صفحه‌بندی"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         try:
@@ -330,11 +302,11 @@ class GoodsEntryDB:
             print(f"❌ خطا در دریافت لیست فرم‌ها: {e}")
             return []
         finally:
-            conn.close()
+            self._close(conn)
     
     def get_document_file(self, entry_number, document_name):
         """دریافت فایل سند"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         try:
@@ -358,11 +330,11 @@ class GoodsEntryDB:
             print(f"❌ خطا در دریافت سند: {e}")
             return None, None
         finally:
-            conn.close()
+            self._close(conn)
     
     def delete_entry(self, entry_number):
         """حذف یک فرم و تمام داده‌های مرتبط"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         try:
@@ -401,11 +373,11 @@ class GoodsEntryDB:
             print(f"❌ خطا در حذف فرم: {e}")
             return False
         finally:
-            conn.close()
+            self._close(conn)
     
     def get_statistics(self):
         """دریافت آمار پایگاه داده"""
-        conn = sqlite3.connect(self.db_path)
+        conn = self._connect()
         cursor = conn.cursor()
         
         try:
@@ -432,7 +404,7 @@ class GoodsEntryDB:
             print(f"❌ خطا در دریافت آمار: {e}")
             return {}
         finally:
-            conn.close()
+            self._close(conn)
 
 # تست پایگاه داده
 def test_database():
@@ -0,0 +1,251 @@
+import os
+import sqlite3
+
+# اندازه هر دسته در به‌روزرسانی‌های انبوه (برای کوتاه نگه داشتن قفل نوشتن)
+BACKFILL_BATCH_SIZE = 500
+
+
+def connect(db_path, timeout=30):
+    """باز کردن اتصال با تنظیمات استاندارد پروژه"""
+    conn = sqlite3.connect(db_path, timeout=timeout)
+    conn.execute('PRAGMA foreign_keys = ON')
+    return conn
+
+
+def get_schema_version(conn):
+    """خواندن نسخه فعلی اسکیما از user_version"""
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+
+def _run_in_transaction(conn, sql_statements):
+    """اجرای چند دستور در یک تراکنش کوتاه"""
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        for sql in sql_statements:
+            conn.execute(sql)
+        conn.execute('COMMIT')
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+
+
+def _backfill_in_batches(conn, table, set_clause, where_clause, batch_size=None):
+    """به‌روزرسانی دسته‌ای رکوردها؛ هر دسته در تراکنش جداگانه ثبت می‌شود"""
+    batch_size = batch_size or BACKFILL_BATCH_SIZE
+    total = conn.execute(f'SELECT COUNT(*) FROM {table} WHERE {where_clause}').fetchone()[0]
+    done = 0
+    last_id = 0
+
+    while done < total:
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            row = conn.execute(f'''
+                SELECT MAX(id) FROM (
+                    SELECT id FROM {table}
+                    WHERE id > ? AND {where_clause}
+                    ORDER BY id LIMIT ?
+                )
+            ''', (last_id, batch_size)).fetchone()
+            if row[0] is None:
+                conn.execute('COMMIT')
+                break
+
+            cursor = conn.execute(f'''
+                UPDATE {table} SET {set_clause}
+                WHERE id > ? AND id <= ? AND {where_clause}
+            ''', (last_id, row[0]))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        last_id = row[0]
+        done += cursor.rowcount
+        print(f"   ⏳ {table}: {done}/{total} رکورد به‌روزرسانی شد")
+
+
+def _create_tables(conn):
+    """نسخه ۱: جداول اصلی"""
+    _run_in_transaction(conn, ['''
+        CREATE TABLE IF NOT EXISTS entry_forms (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            entry_number TEXT UNIQUE NOT NULL,
+            entry_date TEXT NOT NULL,
+            entry_time TEXT NOT NULL,
+            full_name TEXT NOT NULL,
+            vehicle_number TEXT,
+            roadway_bill TEXT,
+            internal_bill TEXT,
+            controller TEXT,
+            description TEXT,
+            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+        )
+    ''', '''
+        CREATE TABLE IF NOT EXISTS entry_items (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            entry_id INTEGER NOT NULL,
+            row_number INTEGER NOT NULL,
+            item_name TEXT NOT NULL,
+            serial_number TEXT,
+            invoice_number TEXT,
+            quantity REAL NOT NULL,
+            unit TEXT NOT NULL,
+            FOREIGN KEY (entry_id) REFERENCES entry_forms (id) ON DELETE CASCADE
+        )
+    ''', '''
+        CREATE TABLE IF NOT EXISTS scanned_documents (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            entry_id INTEGER NOT NULL,
+            document_name TEXT NOT NULL,
+            document_type TEXT NOT NULL,
+            file_path TEXT NOT NULL,
+            file_size INTEGER,
+            mime_type TEXT,
+            scan_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            FOREIGN KEY (entry_id) REFERENCES entry_forms (id) ON DELETE CASCADE
+        )
+    '''])
+
+
+def _index_exists(conn, name):
+    """بررسی وجود ایندکس در sqlite_master"""
+    row = conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?", (name,)
+    ).fetchone()
+    return row is not None
+
+
+def _create_indexes(conn):
+    """نسخه ۲: ایندکس‌های کلید خارجی و مرتب‌سازی لیست فرم‌ها"""
+    indexes = [
+        ('idx_entry_items_entry_id', 'entry_items(entry_id)'),
+        ('idx_documents_entry_id', 'scanned_documents(entry_id)'),
+        ('idx_entry_forms_created_at', 'entry_forms(created_at)'),
+    ]
+    # هر ایندکس در تراکنش جداگانه ساخته می‌شود تا قفل نوشتن طولانی نشود
+    for name, target in indexes:
+        if _index_exists(conn, name):
+            print(f"   ℹ️ {name} از قبل وجود دارد")
+            continue
+        _run_in_transaction(conn, [f'CREATE INDEX IF NOT EXISTS {name} ON {target}'])
+        print(f"   ✅ {name} ساخته شد")
+
+
+def _drop_duplicate_entry_number_index(conn):
+    """نسخه ۳: حذف ایندکس دستی idx_entry_number"""
+    # entry_number یکتا است و sqlite_autoindex_entry_forms_1 همین نقش را دارد؛
+    # ایندکس دستی فقط هزینه اضافه در هر درج ایجاد می‌کند
+    if not _index_exists(conn, 'idx_entry_number'):
+        print("   ℹ️ idx_entry_number وجود ندارد")
+        return
+    _run_in_transaction(conn, ['DROP INDEX IF EXISTS idx_entry_number'])
+    print("   ✅ idx_entry_number حذف شد")
+
+
+# لیست مهاجرت‌ها به ترتیب نسخه؛ هر مرحله باید قابل اجرای مجدد باشد
+# مهاجرت‌های داده‌ای حجیم باید از _backfill_in_batches استفاده کنند
+MIGRATIONS = [
+    (1, 'ایجاد جداول اصلی', _create_tables),
+    (2, 'ایجاد ایندکس‌ها', _create_indexes),
+    (3, 'حذف ایندکس تکراری شماره ورود', _drop_duplicate_entry_number_index),
+]
+
+LATEST_VERSION = MIGRATIONS[-1][0]
+
+
+def optimize(conn):
+    """به‌روزرسانی آمار برنامه‌ریز پرس‌وجو"""
+    # 0x10002 همه جداول را بررسی می‌کند، نه فقط جداولی که این اتصال خوانده است
+    conn.execute('PRAGMA optimize=0x10002')
+
+
+def migrate(db_path, target_version=LATEST_VERSION):
+    """اجرای مهاجرت‌های باقی‌مانده تا نسخه هدف"""
+    conn = connect(db_path)
+    # مدیریت تراکنش‌ها به صورت دستی انجام می‌شود
+    conn.isolation_level = None
+
+    try:
+        current_version = get_schema_version(conn)
+        pending = [m for m in MIGRATIONS if current_version < m[0] <= target_version]
+
+        if not pending:
+            # اسکیما به‌روز است؛ فقط آمار برنامه‌ریز در صورت نیاز تازه می‌شود
+            optimize(conn)
+            return current_version
+
+        print(f"🔄 مهاجرت پایگاه داده از نسخه {current_version} به {target_version}")
+        for index, (version, description, step) in enumerate(pending, start=1):
+            print(f"   [{index}/{len(pending)}] نسخه {version}: {description}")
+            step(conn)
+            # PRAGMA user_version در تراکنش جداگانه ثبت می‌شود
+            conn.execute(f'PRAGMA user_version = {version}')
+
+        # ایندکس‌های جدید نیاز به آمار تازه دارند
+        conn.execute('ANALYZE')
+        optimize(conn)
+        print(f"✅ پایگاه داده به نسخه {target_version} رسید")
+        return target_version
+    finally:
+        conn.close()
+
+
+def test_migrations():
+    """تست مهاجرت‌ها روی پایگاه داده موقت"""
+    import tempfile
+
+    print("🧪 شروع تست مهاجرت‌ها...")
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        db_path = os.path.join(tmp_dir, 'legacy.db')
+
+        # پایگاه داده قدیمی با ایندکس‌های دستی و user_version = 0
+        conn = sqlite3.connect(db_path)
+        conn.isolation_level = None
+        _create_tables(conn)
+        conn.execute('CREATE INDEX idx_entry_number ON entry_forms(entry_number)')
+        conn.execute('CREATE INDEX idx_entry_items_entry_id ON entry_items(entry_id)')
+        conn.execute('CREATE INDEX idx_documents_entry_id ON scanned_documents(entry_id)')
+        for i in range(12):
+            conn.execute('''
+                INSERT INTO entry_forms (entry_number, entry_date, entry_time, full_name, updated_at)
+                VALUES (?, '1403/07/15', '14:30:25', 'کاربر تستی', NULL)
+            ''', (f'TEST{i}',))
+        conn.close()
+
+        # مهاجرت از نسخه ۰
+        assert migrate(db_path) == LATEST_VERSION
+        conn = connect(db_path)
+        conn.isolation_level = None
+        assert get_schema_version(conn) == LATEST_VERSION
+        assert not _index_exists(conn, 'idx_entry_number')
+        for name in ('idx_entry_items_entry_id', 'idx_documents_entry_id', 'idx_entry_forms_created_at'):
+            assert _index_exists(conn, name)
+        assert conn.execute('SELECT COUNT(*) FROM entry_forms').fetchone()[0] == 12
+        print("✅ مهاجرت از نسخه ۰ درست انجام شد")
+
+        # اجرای دوباره نباید کاری انجام دهد
+        schema_before = conn.execute('SELECT name, sql FROM sqlite_master ORDER BY name').fetchall()
+        assert migrate(db_path) == LATEST_VERSION
+        assert conn.execute('SELECT name, sql FROM sqlite_master ORDER BY name').fetchall() == schema_before
+        print("✅ اجرای دوباره مهاجرت تغییری ایجاد نکرد")
+
+        # به‌روزرسانی دسته‌ای
+        _backfill_in_batches(
+            conn,
+            'entry_forms',
+            'updated_at = COALESCE(created_at, CURRENT_TIMESTAMP)',
+            'updated_at IS NULL',
+            batch_size=5
+        )
+        remaining = conn.execute('SELECT COUNT(*) FROM entry_forms WHERE updated_at IS NULL').fetchone()[0]
+        assert remaining == 0
+        print("✅ به‌روزرسانی دسته‌ای کامل شد")
+        conn.close()
+
+    print("✅ تمام تست‌های مهاجرت موفق بود")
+
+
+if __name__ == "__main__":
+    test_migrations()